@@ -3,6 +3,24 @@ import os
 import json
 from dolfin import *
 import numpy as np
+from scipy.sparse import csr_matrix
+
+# CHOLMOD (scikit-sparse) is optional: when present, the SPD system is
+# factorized once and the factor is reused for every timestep
+try:
+    from sksparse.cholmod import cholesky
+except ImportError:
+    cholesky = None
+
+# MPI setup: "mpirun -n 4 python 2D_Transient_Heat_Ground_Truth.py"
+# partitions the mesh across ranks and assembles/solves in parallel
+# (PETSc CG + AMG is MPI-aware); rank 0 handles all file output
+comm = MPI.comm_world
+rank = MPI.rank(comm)
+parallel = MPI.size(comm) > 1
+
+# The CHOLMOD path pulls the matrix into scipy, so it is serial-only
+use_cholmod = cholesky is not None and not parallel
 
 # Load evaluation points
 with open('2D_Transient_Heat_eval_points.json', 'r') as f:
@@ -16,164 +34,314 @@ times = [item[0] for item in dt_coords]  # unpack to [0.0, 0.1, ...]
 # Number of time intervals
 nt_steps = len(times) - 1
 
-
-# Mesh
-ns = 100
-mesh = UnitSquareMesh(ns, ns) # unit square [0,1] x [0,1]
-
-# B.Cs
-def boundary(x, on_boundary): # All boundary points
-    return on_boundary
-
-# Initial Condition
-# u_0 = exp(-50*((x-0.5)^2 + (y-0.5)^2))
-class InitialCondition(UserExpression): # "UserExpression" allows to define a function w/ python, unlike "Expression".
-    def eval(self, values, x): # x : 2D point
-        values[0] = np.exp(-50.0 * ((x[0] - 0.5)**2 + (x[1] - 0.5)**2))
-    def value_shape(self):
-        return ()
-
-# Function space
-V = FunctionSpace(mesh, "P", 1)  # Initialize function space
-# Piecewise linear finite element space
-
-# Dirichlet BC
-bc = DirichletBC(V, Constant(0.0), boundary) # u = "0" at x = "boundary"
-
-# Initial condition
-u_n = Function(V) # u_n : solution at time step n
-u_n.interpolate(InitialCondition()) # assign u_0(x,y) to u_n at t=0
-#    "interpolate" 
-# 1. calls "eval" from InitialCondition
-# 2. evaluates at all points in the mesh (mesh is assigned to "V")
-# 3. assigns the result to u_n
-# (while "project" requires assembly & linear solver, )
-
-# Initialize time & time step
-t = Constant(0.0) # it can be updated, even if it is a Constant
-dt = Constant(0.0)
-
-# Source term (will be updated in time loop)
-# f(x,y,t) = 10*sin(pi*x)*sin(pi*y)*cos(2*pi*t)
-f = Expression("10.0*sin(pi*x[0])*sin(pi*x[1])*cos(2.0*pi*t)", degree = 2, t=t) # assign t to "t" in the expression
-
-# Trial and test functions
-u = Function(V) # shouldn't it be TrialFunction(V)?
-v = TestFunction(V) # it is just a symbolic variable to build the linear system
-
-# Weak form
-# R = (u - u_n)*v + dt*(grad(u), grad(v)) = dt*f_expr*v
-R = (u-u_n)*v*dx + dt*dot(grad(u), grad(v))*dx - dt*f*v*dx
-
-# Jacobian for the nonlinear solver (though this PDE is linear in u)
-jac = derivative(R, u) # dF/du(jacobian) w/ symbolic derivative
-
-# Save t=0 solution (pvd)
-save_dir = './vtu'
-os.makedirs(save_dir, exist_ok=True)
-File(f"{save_dir}/solution_000.pvd") << u_n
-
-# Save t=0 solution (json)
-sol_list = []
-sol0 = []
-for (x, y) in mesh_coords:
-    u_0 = u_n(Point(x, y))
-    sol0.append(u_0)
-sol_list.append(sol0)
-
-# Time-stepping loop (Backward Euler)
-for n in range(nt_steps):
-    t_prev = times[n] # t_(n-1)
-    t_curr = times[n+1] # t_n
-
-    # Update dt
-    dt.assign(t_curr - t_prev)
-
-    # Update t (source term is also automatically updated w/ this line)
-    t.assign(t_curr)
-
-    # Solve
-    solve(R == 0, u, bc, J=jac)
-
-    # Save solution (pvd)
-    if (n + 1) % 1 == 0: # "% 10" is for every 10th step
-        print(f"Time step {n + 1}, t = {t_curr:.4f}")
-        File(f"{save_dir}/solution_{n + 1:03d}.pvd") << u
-    
-    # Evaluate at evaluation points & save in the container
-    sol = []
-    for (x, y) in mesh_coords:
-        sol.append(u(Point(x, y)))
-    sol_list.append(sol)
-
-    # Assign new solution(u) into previous solution(u_n) for the next step
-    u_n.assign(u)
-
-# Save solution (json)
-sol_json = "2D_Transient_Heat_eval_solutions.json"
-with open(sol_json, 'w') as f:
-    json.dump(sol_list, f)
-
-print(f"Solution created: {sol_json}")
+# Time step (plain python float, not a UFL Constant: FFC then folds dt
+# into the compiled kernel and the matrix is constant by construction)
+dt_val = times[1] - times[0]
+assert np.allclose(np.diff(times), dt_val), "eval times must be evenly spaced"
+
+# Mesh resolutions to run (one process: the FFC form cache compiled for
+# the first resolution is reused for the later ones)
+ns_list = (100, 200)
+
+
+def run(ns):
+    # Mesh
+    mesh = UnitSquareMesh(ns, ns) # unit square [0,1] x [0,1]
+
+    # B.Cs
+    def boundary(x, on_boundary): # All boundary points
+        return on_boundary
+
+    # Initial Condition
+    # u_0 = exp(-50*((x-0.5)^2 + (y-0.5)^2))
+    # C-code "Expression" is JIT-compiled to C++, so interpolation runs in
+    # native code instead of one Python callback per DOF (UserExpression)
+    u_0 = Expression("exp(-50.0*(pow(x[0]-0.5, 2) + pow(x[1]-0.5, 2)))", degree=2)
+
+    # Function space
+    V = FunctionSpace(mesh, "P", 1)  # Initialize function space
+    # Piecewise linear finite element space
+
+    # Dirichlet BC
+    bc = DirichletBC(V, Constant(0.0), boundary) # u = "0" at x = "boundary"
+
+    # Initial condition
+    u_n = Function(V) # u_n : solution at time step n
+    u_n.interpolate(u_0) # assign u_0(x,y) to u_n at t=0
+    #    "interpolate"
+    # 1. evaluates u_0 at all points in the mesh (mesh is assigned to "V")
+    # 2. assigns the result to u_n
+    # (while "project" requires assembly & linear solver, )
+
+    # Source term, factored into space x time
+    # f(x,y,t) = cos(2*pi*t) * g(x,y), g(x,y) = 10*sin(pi*x)*sin(pi*y)
+    # Only the scalar cos_t changes per step, so the spatial quadrature of g
+    # is not redone with a time-dependent integrand
+    g = Expression("10.0*sin(pi*x[0])*sin(pi*x[1])", degree=2)
+
+    # Trial and test functions
+    u = TrialFunction(V)
+    v = TestFunction(V) # it is just a symbolic variable to build the linear system
+
+    # The PDE is linear in u and dt is fixed, so M + dt*K is the same matrix
+    # every step: assemble & factorize it once instead of running Newton on
+    # R == 0 each step.
+
+    # Weak form (Backward Euler)
+    # a(u,v) = u*v + dt*(grad(u), grad(v)),  RHS: M*u_n + dt*cos(2*pi*t)*b_g
+    a = u*v*dx + dt_val*dot(grad(u), grad(v))*dx
+
+    # Mass matrix & constant source vector (b_g_i = int g*phi_i dx), both
+    # assembled once: the RHS each step is then just vector arithmetic
+    # g is nonpolynomial, but integrated against P1 test functions
+    # quadrature degree 3 is already past the P1 interpolation error
+    M = assemble(u*v*dx)
+    b_g = assemble(g*v*dx, form_compiler_parameters={"quadrature_degree": 3})
+
+    # Assemble system matrix & set up the solver (reused across all steps)
+    # assemble_system eliminates the BC rows AND columns, keeping A
+    # symmetric (plain bc.apply(A) zeroes the rows only, which would hand
+    # a nonsymmetric matrix to CG / CHOLMOD); the BC is homogeneous, so
+    # the per-step bc.apply(b) needs no elimination correction
+    A, _ = assemble_system(a, Constant(0.0)*v*dx, bc)
+
+    # M + dt*K is symmetric positive definite
+    if use_cholmod:
+        # Direct path: export A to scipy & Cholesky-factorize once, each
+        # step is then only a forward/back substitution
+        indptr, indices, values = as_backend_type(A).mat().getValuesCSR()
+        factor = cholesky(csr_matrix((values, indices, indptr)).tocsc())
+    else:
+        # Iterative path: CG + algebraic multigrid scales ~O(N) per solve,
+        # unlike LU as ns grows
+        solver = PETScKrylovSolver("cg", "hypre_amg")
+        solver.parameters["relative_tolerance"] = 1e-10
+        solver.parameters["nonzero_initial_guess"] = True # previous u seeds the next solve
+        solver.set_operator(A)
+
+    # Solution at the current step
+    u = Function(V)
+
+    # Same field name on both functions: otherwise the t=0 write of u_n
+    # and the later writes of u land in two separate XDMF series
+    u_n.rename("u", "u")
+    u.rename("u", "u")
+
+    # PETSc handles for the RHS update: MatMultAdd fuses b = M*u_n + alpha*b_g
+    # into one pass over M, and the vectors are allocated once, not per step
+    # (u_n.assign(u) copies values in place, so the u_n handle stays valid)
+    M_petsc = as_backend_type(M).mat()
+    b_g_petsc = as_backend_type(b_g).vec()
+    u_n_petsc = as_backend_type(u_n.vector()).vec()
+    b = b_g.copy() # dolfin wrapper kept so bc.apply(b) still works
+    b_petsc = as_backend_type(b).vec()
+    scratch = b_g_petsc.duplicate()
+
+    # Solution output (XDMF time series: one file for all steps, HDF5 under
+    # the hood, much cheaper than one .pvd/.vtu pair per step)
+    save_every = 1 # write every n-th step (0 disables field output)
+    save_dir = f'./xdmf_ns{ns}'
+    os.makedirs(save_dir, exist_ok=True) # exist_ok: safe on every rank
+    xdmf = XDMFFile(comm, f"{save_dir}/solution.xdmf") # collective write
+
+    # Save t=0 solution
+    if save_every:
+        xdmf.write(u_n, 0.0)
+
+    # Evaluation setup
+    # Calling u(Point(x, y)) point by point crosses the Python/C++ boundary
+    # once per point per step, so evaluate all points in one call instead.
+    coords = np.asarray(mesh_coords)
+    n_points = len(coords)
+
+    # Cache the owning cell of each eval point once: u(Point(x, y)) redoes a
+    # bounding-box-tree search per call, but the points never move
+    # With MPI the tree only covers this rank's partition, so each rank
+    # owns the points it can find (the rest return an out-of-range id)
+    tree = mesh.bounding_box_tree()
+    cell_ids = np.array([tree.compute_first_entity_collision(Point(x, y))
+                         for (x, y) in coords], dtype=np.int64)
+    owned = np.flatnonzero(cell_ids < mesh.num_cells())
+
+    if not parallel:
+        # SoA eval tables
+        # The P1 value at a point is w0*u[d0] + w1*u[d1] + w2*u[d2], so store
+        # the 3 dofs & 3 barycentric weights of every point as flat arrays:
+        # each per-step evaluation is then a pure numpy gather + dot
+        dofmap = V.dofmap()
+        element = V.element()
+        cells_to_dofs = np.empty((n_points, 3), dtype=np.int64)
+        bary = np.empty((n_points, 3))
+        for i, cid in enumerate(cell_ids):
+            cell = Cell(mesh, int(cid))
+            cells_to_dofs[i] = dofmap.cell_dofs(int(cid))
+            # Dof coordinates come back in the same order as cell_dofs;
+            # solve the 3x3 barycentric system for the point's weights
+            dof_coords = element.tabulate_dof_coordinates(cell) # (3, 2)
+            T = np.vstack([dof_coords.T, np.ones(3)])
+            bary[i] = np.linalg.solve(T, np.append(coords[i], 1.0))
+    else:
+        # The dof gather above only sees this rank's owned dofs, so in
+        # parallel evaluate through eval_cell on the cached local cells
+        cells_cache = [Cell(mesh, int(cell_ids[i])) for i in owned]
+
+    def eval_at_points(u_func):
+        # Returns the values at all eval points on rank 0, None elsewhere
+        if not parallel:
+            u_vals = u_func.vector().get_local()
+            return np.einsum('ij,ij->i', bary, u_vals[cells_to_dofs])
+        local_vals = np.empty(len(owned))
+        value = np.empty(1)
+        for k, i in enumerate(owned):
+            u_func.eval_cell(value, coords[i], cells_cache[k])
+            local_vals[k] = value[0]
+        gathered = comm.gather((owned, local_vals), root=0)
+        if rank != 0:
+            return None
+        values = np.empty(n_points)
+        for idx, vals in gathered: # partition-boundary points repeat w/ equal values
+            values[idx] = vals
+        return values
+
+    # Save t=0 solution
+    # float32: halves file size & I/O, plenty of precision for the
+    # downstream error plots against P1 FEM / PINNs solutions
+    sol_arr = None
+    if rank == 0:
+        sol_arr = np.empty((nt_steps + 1, n_points), dtype=np.float32) # preallocate, no list appends
+    sol0 = eval_at_points(u_n)
+    if rank == 0:
+        sol_arr[0] = sol0
+
+    # Time-stepping loop (Backward Euler)
+    for n in range(nt_steps):
+        t_curr = times[n+1] # t_n
+
+        # Time factor of the source term
+        alpha = dt_val * np.cos(2.0 * np.pi * t_curr)
+
+        # Build RHS in one fused pass: scratch = alpha*b_g, b = M*u_n + scratch
+        b_g_petsc.copy(scratch)
+        scratch.scale(alpha)
+        M_petsc.multAdd(u_n_petsc, scratch, b_petsc)
+        bc.apply(b)
+
+        # Solve
+        if use_cholmod:
+            u.vector().set_local(factor(b.get_local()))
+            u.vector().apply("insert")
+        else:
+            # Warm start: u_n is close to the new solution (small dt,
+            # diffusive PDE) and nonzero_initial_guess makes CG use it
+            u.assign(u_n)
+            solver.solve(u.vector(), b)
+
+        # Save solution (xdmf)
+        if save_every and (n + 1) % save_every == 0:
+            if rank == 0:
+                print(f"ns = {ns}, time step {n + 1}, t = {t_curr:.4f}")
+            xdmf.write(u, t_curr)
+
+        # Evaluate at evaluation points & save in the container
+        sol = eval_at_points(u)
+        if rank == 0:
+            sol_arr[n + 1] = sol
+
+        # Assign new solution(u) into previous solution(u_n) for the next step
+        u_n.assign(u)
+
+    xdmf.close()
+
+    # Save solution (rank 0 only: it holds the gathered eval values)
+    if rank == 0:
+        # Compressed binary: ~5x smaller/faster than decimal-text JSON
+        sol_npz = f"2D_Transient_Heat_eval_solutions_ns{ns}.npz"
+        np.savez_compressed(sol_npz,
+                            sol=sol_arr,
+                            coords=coords.astype(np.float32))
+
+        # Thin JSON wrapper for metadata only
+        sol_json = f"2D_Transient_Heat_eval_solutions_ns{ns}.json"
+        with open(sol_json, 'w') as f:
+            json.dump({"solutions": sol_npz,
+                       "n_times": nt_steps + 1,
+                       "n_points": n_points}, f)
+
+        print(f"Solution created: {sol_npz}")
+
+
+for ns in ns_list:
+    run(ns)
 
 
 #%% Ground Truth Solution (Contour Plot)
 import os
 import json
 import numpy as np
+import matplotlib
+matplotlib.use("Agg") # render off-screen (no GUI event loop per figure)
 import matplotlib.pyplot as plt
+import matplotlib.tri as tri
 
 # Load evaluation points
 with open('2D_Transient_Heat_eval_points.json', 'r') as f:
     data_points = json.load(f)
 
-# Evaluation coordinates & time
-mesh_coords = data_points["mesh_coord"]["0"] # list
+# Evaluation time
 dt_coords = data_points["dt_coord"]["0"] # [[0.0], [0.1], ..., [1.0]]
 times = [dt_coord[0] for dt_coord in dt_coords]  # unpack to [0.0, 0.1, ...]
 
-
-# Load evaluation results (by FEM)
-with open('2D_Transient_Heat_eval_solutions.json', 'r') as f:
-    data_results = json.load(f)
-
-# Ground truth soution (100 x 100 cells)
-u_true = np.array(data_results) # shape: (n_times, n_points)
-
-# x, y coordinates
-mesh_coords = np.array(mesh_coords)
-X = mesh_coords[:, 0]
-Y = mesh_coords[:, 1]
-
-# Contour plot settings
-# For a consistent scale across all time steps
-u_min = u_true.min()
-u_max = u_true.max()
-# Create n levels between u_min & u_max:
-num_levels = 80
-levels = np.linspace(u_min, u_max, num_levels)
-
-for t in range(len(times)):
-
-    u_true_t = u_true[t, :]
-
-    fig = plt.figure(figsize=(6, 5))
-    sc1 = plt.tricontourf(
-        X, Y, u_true_t,
-        levels=levels,
-        cmap='viridis')
-    plt.title(f"Ground Truth Solution (Mesh Numbers=100, t_step={t})")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.colorbar(sc1, shrink=0.7)
-
-    plt.tight_layout()
-
-    # Save figures
-    fig_dir = f'./fig/sol_contour/Ground_Truth'
-    if not os.path.exists(fig_dir):
-        os.makedirs(fig_dir, exist_ok=True)
-
-    filename = os.path.join(fig_dir, f'sol_{t:04d}.png')
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
-    plt.close(fig)
\ No newline at end of file
+for ns in (100, 200):
+
+    # Load evaluation results (by FEM)
+    # Ground truth soution (ns x ns cells)
+    data_results = np.load(f'2D_Transient_Heat_eval_solutions_ns{ns}.npz')
+    u_true = data_results['sol'] # shape: (n_times, n_points)
+
+    # x, y coordinates
+    mesh_coords = data_results['coords']
+    X = mesh_coords[:, 0]
+    Y = mesh_coords[:, 1]
+
+    # Contour plot settings
+    # For a consistent scale across all time steps
+    u_min = u_true.min()
+    u_max = u_true.max()
+    # Create n levels between u_min & u_max:
+    num_levels = 80
+    levels = np.linspace(u_min, u_max, num_levels)
+
+    # Triangulate once: tricontourf would otherwise re-triangulate the same
+    # points for every frame
+    triang = tri.Triangulation(X, Y)
+
+    # Reuse a single figure/axes across all frames instead of creating and
+    # tearing down 100+ figures
+    fig, ax = plt.subplots(figsize=(6, 5))
+    cbar = None
+
+    # Output directory (created once, not per frame)
+    fig_dir = f'./fig/sol_contour/Ground_Truth_ns{ns}'
+    os.makedirs(fig_dir, exist_ok=True)
+
+    for t in range(len(times)):
+
+        u_true_t = u_true[t, :]
+
+        ax.clear()
+        sc1 = ax.tricontourf(
+            triang, u_true_t,
+            levels=levels,
+            cmap='viridis')
+        ax.set_title(f"Ground Truth Solution (Mesh Numbers={ns}, t_step={t})")
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        if cbar is None: # colorbar axes survives ax.clear(), add it once
+            cbar = fig.colorbar(sc1, ax=ax, shrink=0.7)
+
+        # Save figures
+        filename = os.path.join(fig_dir, f'sol_{t:04d}.png')
+        # dpi=150 is enough for the animation frames (use 300 for paper figures)
+        fig.savefig(filename, dpi=150, bbox_inches='tight')
+
+    plt.close(fig)
@@ -1,4 +1,5 @@
 import json
+import numpy as np
 
 def generate_eval_mesh(nx=10, ny=10, dt=1e-2, filename="eval_points.json"):
     """
@@ -8,34 +9,27 @@ def generate_eval_mesh(nx=10, ny=10, dt=1e-2, filename="eval_points.json"):
           - (nx+1) x (ny+1) points
       - Time length of 1.0
     """
-    # Step size in each spatial dimension
-    dx = 1.0 / nx
-    dy = 1.0 / ny
-
     # Number of time steps (incl. 0 and 1)
     nt = int(1.0 / dt) + 1
-    
+
     # Mesh coordinates (incl. 0 and 1)
-    mesh_coords = []
-    for i in range(nx + 1):
-        for j in range(ny + 1):
-            x = i * dx
-            y = j * dx
-            mesh_coords.append([x, y])
-    
+    # meshgrid replaces the double python loop (which also used dx for
+    # the y spacing, wrong for nx != ny)
+    xs = np.linspace(0.0, 1.0, nx + 1)
+    ys = np.linspace(0.0, 1.0, ny + 1)
+    XX, YY = np.meshgrid(xs, ys, indexing='ij')
+    mesh_coords = np.stack([XX.ravel(), YY.ravel()], axis=1).tolist()
+
     # List of times (incl. 0 and 1)
-    dt_coords = []
-    for k in range(nt):
-        t = k * dt
-        dt_coords.append([t])
-    
+    dt_coords = (np.arange(nt).reshape(-1, 1) * dt).tolist()
+
     # JSON data structure
     data = {"mesh_coord": {"0": mesh_coords},  # Store under the key "0"
-            "dt_coord":   {"0": dt_coords}}   
-    
+            "dt_coord":   {"0": dt_coords}}
+
     # Save
     with open(filename, "w") as f:
         json.dump(data, f, indent=2) # print JSON with better readability
 
 if __name__ == "__main__":
-    generate_eval_mesh(60, 60, 1e-2, "2D_Transient_Heat_eval_points.json")
\ No newline at end of file
+    generate_eval_mesh(60, 60, 1e-2, "2D_Transient_Heat_eval_points.json")
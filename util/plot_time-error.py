@@ -23,13 +23,21 @@ fem_times_eval = fem_data['times_eval']
 
 # Plot PINNs performance
 plt.figure(figsize=(7, 5))
+# One scatter call per category instead of one PathCollection per point
+pinns_x = [pinns_l2_rel[idx] for idx in pinns_arch]
+pinns_y = [pinns_times_train[idx] for idx in pinns_arch]
+plt.scatter(pinns_x, pinns_y, s=100, label="PINNs")
 # Annotate each point with its architecture
-for idx, architecture in pinns_arch.items():
-    plt.scatter(pinns_l2_rel[idx], pinns_times_train[idx], s=100, label=f"PINNs, {architecture}")
+for x, y, architecture in zip(pinns_x, pinns_y, pinns_arch.values()):
+    plt.annotate(architecture, (x, y), textcoords="offset points", xytext=(6, 4), fontsize=8)
 
 # Plot FEM performance
-for idx, ns in enumerate(fem_ns):
-    plt.scatter(fem_l2_rel[str(idx)], fem_times_solve[str(idx)], s=100, marker='^', label=f"FEM,    {ns}x{ns}")
+fem_x = [fem_l2_rel[str(idx)] for idx in range(len(fem_ns))]
+fem_y = [fem_times_solve[str(idx)] for idx in range(len(fem_ns))]
+plt.scatter(fem_x, fem_y, s=100, marker='^', label="FEM")
+# Annotate each point with its mesh resolution
+for x, y, ns in zip(fem_x, fem_y, fem_ns):
+    plt.annotate(f"{ns}x{ns}", (x, y), textcoords="offset points", xytext=(6, 4), fontsize=8)
 
 plt.xlabel(r"Relative $L_2$ Error")
 plt.ylabel("Training / Solving Time (seconds)")
@@ -40,8 +48,7 @@ plt.tight_layout()
 
 # Save figures
 fig_dir = './fig'
-if not os.path.exists(fig_dir):
-    os.makedirs(fig_dir, exist_ok=True)
+os.makedirs(fig_dir, exist_ok=True)
 
 filename = os.path.join(fig_dir, 'solving_time-error.png')
 plt.savefig(filename, dpi=300, bbox_inches='tight')
@@ -72,13 +79,21 @@ fem_times_eval = fem_data['times_eval']
 
 # Plot PINNs performance
 plt.figure(figsize=(7, 5))
+# One scatter call per category instead of one PathCollection per point
+pinns_x = [pinns_l2_rel[idx] for idx in pinns_arch]
+pinns_y = [pinns_times_eval[idx] for idx in pinns_arch]
+plt.scatter(pinns_x, pinns_y, s=100, label="PINNs")
 # Annotate each point with its architecture
-for idx, architecture in pinns_arch.items():
-    plt.scatter(pinns_l2_rel[idx], pinns_times_eval[idx], s=100, label=f"PINNs, {architecture}")
+for x, y, architecture in zip(pinns_x, pinns_y, pinns_arch.values()):
+    plt.annotate(architecture, (x, y), textcoords="offset points", xytext=(6, 4), fontsize=8)
 
 # Plot FEM performance
-for idx, ns in enumerate(fem_ns):
-    plt.scatter(fem_l2_rel[str(idx)], fem_times_eval[str(idx)], s=100, marker='^', label=f"FEM,    {ns}x{ns}")
+fem_x = [fem_l2_rel[str(idx)] for idx in range(len(fem_ns))]
+fem_y = [fem_times_eval[str(idx)] for idx in range(len(fem_ns))]
+plt.scatter(fem_x, fem_y, s=100, marker='^', label="FEM")
+# Annotate each point with its mesh resolution
+for x, y, ns in zip(fem_x, fem_y, fem_ns):
+    plt.annotate(f"{ns}x{ns}", (x, y), textcoords="offset points", xytext=(6, 4), fontsize=8)
 
 plt.xlabel(r"Relative $L_2$ Error")
 plt.ylabel("Evaluation Time (seconds)")
@@ -89,8 +104,7 @@ plt.tight_layout()
 
 # Save figures
 fig_dir = './fig'
-if not os.path.exists(fig_dir):
-    os.makedirs(fig_dir, exist_ok=True)
+os.makedirs(fig_dir, exist_ok=True)
 
 filename = os.path.join(fig_dir, 'evaluation_time-error.png')
 plt.savefig(filename, dpi=300, bbox_inches='tight')